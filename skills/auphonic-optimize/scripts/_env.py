@@ -0,0 +1,19 @@
+"""
+Minimal .env loader shared by the auphonic-optimize scripts.
+"""
+
+import os
+import re
+from pathlib import Path
+
+ENV_LINE = re.compile(r"^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=(.*)$", re.M)
+
+
+def load_dotenv(repo_root: Path):
+    """Load KEY=value pairs from .env without overriding existing variables."""
+    env_path = repo_root / ".env"
+    if not env_path.exists():
+        env_path = Path.cwd() / ".env"
+    if env_path.exists():
+        for key, value in ENV_LINE.findall(env_path.read_text()):
+            os.environ.setdefault(key, value.strip())
@@ -0,0 +1,18 @@
+"""
+HTTP session setup shared by the auphonic-optimize scripts.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 16
+
+
+def create_session(api_key: str) -> requests.Session:
+    """Shared session so every API call reuses pooled keep-alive connections."""
+    session = requests.Session()
+    session.headers.update({"Authorization": f"bearer {api_key}"})
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries))
+    return session
@@ -0,0 +1,67 @@
+"""
+JSON helpers shared by the auphonic-optimize scripts.
+
+Uses orjson when it is installed and falls back to the standard library.
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    # Match orjson, which serializes dates and datetimes as ISO 8601.
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_default).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+
+def emit(obj, indent: bool = False):
+    """Print obj as JSON, writing the encoded bytes straight to stdout."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(dumps(obj, indent=indent) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def read_json(path: Path):
+    return loads(path.read_bytes())
+
+
+def write_json(path: Path, obj):
+    """Atomically write obj as indented JSON with a trailing newline.
+
+    The data goes to a temp file next to path and is swapped in with
+    os.replace, so an interrupted write never leaves a truncated file.
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(dumps(obj, indent=True))
+            f.write(b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
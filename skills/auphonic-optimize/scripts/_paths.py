@@ -0,0 +1,32 @@
+"""
+Filesystem locations shared by the auphonic-optimize scripts, resolved once at import.
+
+The skill is installed at <repo>/.claude/skills/auphonic-optimize/.
+"""
+
+import functools
+import os
+from pathlib import Path
+
+from _jsonio import read_json, write_json
+
+SKILL_DIR = Path(os.path.realpath(__file__)).parent.parent
+REPO_ROOT = SKILL_DIR.parents[2]
+CONFIG_PATH = SKILL_DIR / "config.json"
+
+
+@functools.lru_cache(maxsize=1)
+def load_config() -> dict:
+    """Read config.json once per run.
+
+    Every caller gets the same dict. Callers that change it must save it
+    back with save_config() rather than treating it as a private copy.
+    """
+    try:
+        return read_json(CONFIG_PATH)
+    except FileNotFoundError:
+        return {"default_preset": None, "presets": {}}
+
+
+def save_config(config: dict):
+    write_json(CONFIG_PATH, config)
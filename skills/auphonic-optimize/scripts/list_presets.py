@@ -12,16 +12,16 @@ Environment:
 """
 
 import argparse
-import json
 import os
 import sys
-from pathlib import Path
 
 import requests
 
-REPO_ROOT = Path(__file__).resolve().parents[4]
-SKILL_DIR = Path(__file__).resolve().parents[1]
-CONFIG_PATH = SKILL_DIR / "config.json"
+from _env import load_dotenv
+from _http import create_session
+from _jsonio import emit, loads
+from _paths import REPO_ROOT, load_config, save_config
+
 API_BASE = "https://auphonic.com/api"
 
 
@@ -38,32 +38,6 @@ def parse_args():
     return parser.parse_args()
 
 
-def load_dotenv():
-    env_path = REPO_ROOT / ".env"
-    if not env_path.exists():
-        env_path = Path.cwd() / ".env"
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
-def load_config() -> dict:
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return json.load(f)
-    return {"default_preset": None, "presets": {}}
-
-
-def save_config(config: dict):
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(config, f, indent=2)
-        f.write("\n")
-
-
 def get_api_key() -> str:
     api_key = os.environ.get("AUPHONIC_API_KEY")
     if not api_key:
@@ -72,85 +46,128 @@ def get_api_key() -> str:
     return api_key
 
 
-def fetch_presets(api_key: str) -> list[dict]:
-    resp = requests.get(
+def _request_presets(session: requests.Session, config: dict) -> requests.Response:
+    """GET the preset list, conditional on the cached ETag. Returns a 200 or 304 response."""
+    headers = {}
+    if config.get("presets_cache") is not None and config.get("presets_etag"):
+        headers["If-None-Match"] = config["presets_etag"]
+
+    resp = session.get(
         f"{API_BASE}/presets.json",
         params={"minimal_data": "1"},
-        headers={"Authorization": f"bearer {api_key}"},
+        headers=headers,
         timeout=30,
     )
-    if resp.status_code != 200:
+    if resp.status_code not in (200, 304):
         print(f"Error: Auphonic API returned {resp.status_code}: {resp.text}", file=sys.stderr)
         sys.exit(1)
+    return resp
 
-    body = resp.json()
-    presets = body.get("data", [])
 
-    result = []
-    for p in presets:
-        result.append({
-            "uuid": p.get("uuid", ""),
-            "name": p.get("preset_name", "Untitled"),
-            "created": (p.get("creation_time") or "")[:10],
-            "is_multitrack": p.get("is_multitrack", False),
-        })
+def _extract(p: dict) -> dict:
+    return {
+        "uuid": p.get("uuid", ""),
+        "name": p.get("preset_name", "Untitled"),
+        "created": (p.get("creation_time") or "")[:10],
+        "is_multitrack": p.get("is_multitrack", False),
+    }
+
+
+def _cache_presets(config: dict, etag: str | None, presets: list[dict] | None):
+    """Store the preset list under its ETag, or drop the cache when there is no ETag."""
+    if etag:
+        config["presets_etag"] = etag
+        config["presets_cache"] = presets
+    else:
+        config.pop("presets_etag", None)
+        config.pop("presets_cache", None)
+
+
+def fetch_presets(session: requests.Session, config: dict) -> list[dict]:
+    """Fetch presets, reusing the list cached in config when the ETag still matches."""
+    resp = _request_presets(session, config)
+    if resp.status_code == 304:
+        return config["presets_cache"]
+
+    result = [_extract(p) for p in loads(resp.content).get("data", [])]
+    _cache_presets(config, resp.headers.get("ETag"), result)
     return result
 
 
+def fetch_preset_names(session: requests.Session, config: dict) -> dict[str, str]:
+    """Map preset UUIDs to names, building full entries only when they can be cached."""
+    resp = _request_presets(session, config)
+    if resp.status_code == 304:
+        return {p["uuid"]: p["name"] for p in config["presets_cache"]}
+
+    data = loads(resp.content).get("data", [])
+    etag = resp.headers.get("ETag")
+    if not etag:
+        _cache_presets(config, None, None)
+        return {p.get("uuid", ""): p.get("preset_name", "Untitled") for p in data}
+
+    presets = [_extract(p) for p in data]
+    _cache_presets(config, etag, presets)
+    return {p["uuid"]: p["name"] for p in presets}
+
+
 def handle_show_saved():
     config = load_config()
     default_uuid = config.get("default_preset")
     if not default_uuid:
-        print(json.dumps({"status": "no_default", "message": "No default preset saved"}))
+        emit({"status": "no_default", "message": "No default preset saved"})
         return
     name = config.get("presets", {}).get(default_uuid, "Unknown")
-    print(json.dumps({"status": "ok", "uuid": default_uuid, "name": name}))
+    emit({"status": "ok", "uuid": default_uuid, "name": name})
 
 
-def handle_save(uuid: str, api_key: str):
+def handle_save(uuid: str, session: requests.Session):
     config = load_config()
 
     cached_name = config.get("presets", {}).get(uuid)
+    if cached_name and config.get("default_preset") == uuid:
+        emit({"status": "unchanged", "uuid": uuid, "name": cached_name})
+        return
+
     if not cached_name:
-        presets = fetch_presets(api_key)
-        matched = [p for p in presets if p["uuid"] == uuid]
-        if not matched:
+        cached_name = fetch_preset_names(session, config).get(uuid)
+        if not cached_name:
+            save_config(config)  # keep the refreshed preset cache
             print(f"Error: Preset UUID '{uuid}' not found in your Auphonic account", file=sys.stderr)
             sys.exit(1)
-        cached_name = matched[0]["name"]
 
     config["default_preset"] = uuid
     config.setdefault("presets", {})[uuid] = cached_name
     save_config(config)
 
-    print(json.dumps({"status": "saved", "uuid": uuid, "name": cached_name}))
+    emit({"status": "saved", "uuid": uuid, "name": cached_name})
 
 
-def handle_list(api_key: str):
-    presets = fetch_presets(api_key)
+def handle_list(session: requests.Session):
     config = load_config()
+    presets = fetch_presets(session, config)
 
     for p in presets:
         config.setdefault("presets", {})[p["uuid"]] = p["name"]
     save_config(config)
 
-    print(json.dumps(presets, indent=2))
+    emit(presets, indent=True)
 
 
 def main():
     args = parse_args()
-    load_dotenv()
+    load_dotenv(REPO_ROOT)
 
     if args.show_saved:
         handle_show_saved()
         return
 
-    api_key = get_api_key()
+    session = create_session(get_api_key())
 
     if args.save:
-        handle_save(args.save, api_key)
+        handle_save(args.save, session)
     else:
-        handle_list(api_key)
+        handle_list(session)
 
 
 if __name__ == "__main__":
@@ -16,32 +16,57 @@ Usage:
 The --file argument is a path relative to the project directory.
 The --project-dir argument is relative to repo root.
 
+Instead of polling, completion can be signalled by an Auphonic webhook: pass
+--webhook-url (or set AUPHONIC_WEBHOOK_URL) to a public URL, e.g. an ngrok or
+cloudflared tunnel, that forwards to --webhook-port on localhost.
+
 Environment:
     AUPHONIC_API_KEY must be set (or present in .env at the repo root).
+    AUPHONIC_WEBHOOK_URL optionally enables the webhook (see above).
 """
 
 import argparse
-import json
 import os
+import random
+import stat
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs
 
 import requests
 
-REPO_ROOT = Path(__file__).resolve().parents[4]
-SKILL_DIR = Path(__file__).resolve().parents[1]
-CONFIG_PATH = SKILL_DIR / "config.json"
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+from _env import load_dotenv
+from _http import create_session
+from _jsonio import emit, loads, read_json, write_json
+from _paths import REPO_ROOT, load_config
+
 API_BASE = "https://auphonic.com/api"
 
-AUDIO_EXTENSIONS = {".mp3", ".wav", ".aac", ".flac", ".m4a", ".ogg", ".opus", ".wma"}
+AUDIO_EXTENSIONS = frozenset({"mp3", "wav", "aac", "flac", "m4a", "ogg", "opus", "wma"})
+# Non-audio production outputs that are not downloaded.
+SKIP_FORMATS = frozenset({"descr", "stats", "chaps", "psc", "cut-list", "waveform", "image"})
 
 STATUS_DONE = 3
 STATUS_ERROR = 9
 STATUS_INCOMPLETE = 13
-POLL_INTERVAL = 10
+POLL_INITIAL_DELAY = 2.0
+POLL_MAX_DELAY = 30.0
+POLL_MAX_ERROR_DELAY = 60.0
 MAX_POLL_TIME = 600
+WEBHOOK_PORT = 8765
+# Kept within _http.POOL_SIZE so each download worker gets its own pooled keep-alive connection.
+MAX_DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 def parse_args():
@@ -66,29 +91,21 @@ def parse_args():
         "--output-dir", default="audio/optimized",
         help="Subdirectory within project for the result (default: audio/optimized)"
     )
+    parser.add_argument(
+        "--webhook-url",
+        help="Public URL forwarding to the local webhook listener (falls back to AUPHONIC_WEBHOOK_URL)"
+    )
+    parser.add_argument(
+        "--webhook-port", type=int, default=WEBHOOK_PORT,
+        help=f"Port for the webhook listener, bound to 127.0.0.1 only (default: {WEBHOOK_PORT})"
+    )
+    parser.add_argument(
+        "--no-webhook", action="store_true",
+        help="Poll for completion even if a webhook URL is configured"
+    )
     return parser.parse_args()
 
 
-def load_dotenv():
-    env_path = REPO_ROOT / ".env"
-    if not env_path.exists():
-        env_path = Path.cwd() / ".env"
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
-
-
-def load_config() -> dict:
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return json.load(f)
-    return {"default_preset": None, "presets": {}}
-
-
 def get_api_key() -> str:
     api_key = os.environ.get("AUPHONIC_API_KEY")
     if not api_key:
@@ -109,28 +126,41 @@ def resolve_preset(args_preset: str | None) -> str:
     return default
 
 
-def upload_and_start(api_key: str, file_path: Path, preset_uuid: str, title: str) -> dict:
+def upload_and_start(session: requests.Session, file_path: Path, file_size: int, preset_uuid: str,
+                     title: str, webhook_url: str | None = None) -> dict:
     """Upload audio and start production in a single Simple API request."""
-    print(f"Uploading {file_path.name} to Auphonic...", file=sys.stderr)
+    print(f"Uploading {file_path.name} ({file_size / 1_000_000:.1f} MB) to Auphonic...", file=sys.stderr)
+
+    fields = {
+        "preset": preset_uuid,
+        "title": title,
+        "action": "start",
+    }
+    if webhook_url:
+        fields["webhook"] = webhook_url
 
     with open(file_path, "rb") as f:
-        resp = requests.post(
+        if MultipartEncoder is not None:
+            # Stream the multipart body from disk instead of building it in memory.
+            encoder = MultipartEncoder(fields={
+                **fields,
+                "input_file": (file_path.name, f, "application/octet-stream"),
+            })
+            payload = {"data": encoder, "headers": {"Content-Type": encoder.content_type}}
+        else:
+            payload = {"files": {"input_file": (file_path.name, f)}, "data": fields}
+
+        resp = session.post(
             f"{API_BASE}/simple/productions.json",
-            headers={"Authorization": f"bearer {api_key}"},
-            files={"input_file": (file_path.name, f)},
-            data={
-                "preset": preset_uuid,
-                "title": title,
-                "action": "start",
-            },
             timeout=300,
+            **payload,
         )
 
     if resp.status_code != 200:
         print(f"Error: Auphonic API returned {resp.status_code}: {resp.text}", file=sys.stderr)
         sys.exit(1)
 
-    body = resp.json()
+    body = loads(resp.content)
     if body.get("error_code"):
         print(f"Error: {body.get('error_message', 'Unknown error')}", file=sys.stderr)
         sys.exit(1)
@@ -138,89 +168,196 @@ def upload_and_start(api_key: str, file_path: Path, preset_uuid: str, title: str
     return body["data"]
 
 
-def poll_status(api_key: str, production_uuid: str) -> dict:
-    """Poll production status until done or error."""
+def get_production(session: requests.Session, production_uuid: str) -> dict | None:
+    """Fetch the current production data, or None if the request failed."""
+    resp = session.get(
+        f"{API_BASE}/production/{production_uuid}.json",
+        timeout=30,
+    )
+    if resp.status_code != 200:
+        print(f"Warning: Status check returned {resp.status_code}, retrying...", file=sys.stderr)
+        return None
+    return loads(resp.content).get("data", {})
+
+
+def exit_if_failed(data: dict):
+    if data.get("status") in (STATUS_ERROR, STATUS_INCOMPLETE):
+        error_msg = data.get("error_message", "Unknown error")
+        print(f"Error: Production failed — {error_msg}", file=sys.stderr)
+        sys.exit(1)
+
+
+def poll_status(session: requests.Session, production_uuid: str) -> dict:
+    """Poll production status until done or error, backing off between checks."""
     print(f"Processing (production: {production_uuid})...", file=sys.stderr)
-    waited = 0
+    start = time.monotonic()
+    delay = POLL_INITIAL_DELAY
 
-    while waited < MAX_POLL_TIME:
-        time.sleep(POLL_INTERVAL)
-        waited += POLL_INTERVAL
+    while time.monotonic() - start < MAX_POLL_TIME:
+        # Jitter keeps concurrent runs from polling in lockstep.
+        time.sleep(delay + random.uniform(0, delay * 0.1))
+        waited = round(time.monotonic() - start)
 
-        resp = requests.get(
-            f"{API_BASE}/production/{production_uuid}.json",
-            headers={"Authorization": f"bearer {api_key}"},
-            timeout=30,
-        )
-        if resp.status_code != 200:
-            print(f"Warning: Status check returned {resp.status_code}, retrying...", file=sys.stderr)
+        data = get_production(session, production_uuid)
+        if data is None:
+            delay = min(delay * 2, POLL_MAX_ERROR_DELAY)
             continue
 
-        data = resp.json().get("data", {})
-        status = data.get("status")
         status_str = data.get("status_string", "Unknown")
-
         print(f"  Status: {status_str} ({waited}s elapsed)", file=sys.stderr)
 
-        if status == STATUS_DONE:
+        if data.get("status") == STATUS_DONE:
             return data
-        if status in (STATUS_ERROR, STATUS_INCOMPLETE):
-            error_msg = data.get("error_message", "Unknown error")
-            print(f"Error: Production failed — {error_msg}", file=sys.stderr)
-            sys.exit(1)
+        exit_if_failed(data)
+
+        delay = min(delay * 1.5, POLL_MAX_DELAY)
 
     print(f"Error: Production timed out after {MAX_POLL_TIME}s", file=sys.stderr)
     sys.exit(1)
 
 
-def download_results(api_key: str, production_data: dict, output_path: Path) -> list[dict]:
-    """Download all output files from a completed production."""
-    output_path.mkdir(parents=True, exist_ok=True)
-    downloaded = []
+class _WebhookHandler(BaseHTTPRequestHandler):
+    """Records the production UUID from each Auphonic webhook POST."""
+
+    def do_POST(self):
+        try:
+            length = int(self.headers["Content-Length"])
+            if length < 0:
+                raise ValueError("negative Content-Length")
+            body = self.rfile.read(length).decode("utf-8", "replace")
+            if body.lstrip().startswith(("{", "[")):
+                uuid = loads(body).get("uuid")
+            else:
+                uuid = parse_qs(body).get("uuid", [None])[0]
+        except (TypeError, ValueError, AttributeError):
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        if uuid:
+            self.server.completed.add(uuid)
+            self.server.notify.set()
+
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_webhook_listener(port: int) -> ThreadingHTTPServer:
+    """Serve the webhook endpoint on a background thread, reachable only via localhost."""
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _WebhookHandler)
+    except OSError as e:
+        print(f"Error: Cannot listen for webhooks on port {port} ({e.strerror}). "
+              "Is the port already in use? Pick another with --webhook-port.", file=sys.stderr)
+        sys.exit(1)
+    server.completed = set()
+    server.notify = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for_webhook(session: requests.Session, production_uuid: str, server: ThreadingHTTPServer) -> dict:
+    """Block until Auphonic calls the webhook, then fetch the production once.
+
+    Falls back to polling if the callback never arrives, e.g. because the tunnel is down.
+    """
+    print(f"Processing (production: {production_uuid}), waiting for webhook...", file=sys.stderr)
+    deadline = time.monotonic() + MAX_POLL_TIME
+
+    while production_uuid not in server.completed:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not server.notify.wait(remaining):
+            print(f"Warning: No webhook received after {MAX_POLL_TIME}s, checking status and polling instead...",
+                  file=sys.stderr)
+            break
+        server.notify.clear()
+
+    data = get_production(session, production_uuid)
+    if data is not None:
+        print(f"  Status: {data.get('status_string', 'Unknown')}", file=sys.stderr)
+        if data.get("status") == STATUS_DONE:
+            return data
+        exit_if_failed(data)
 
-    output_files = production_data.get("output_files", [])
-    for of in output_files:
-        url = of.get("download_url")
-        filename = of.get("filename")
-        if not url or not filename:
-            continue
+    # No callback, or it arrived before the production was readable as done.
+    return poll_status(session, production_uuid)
 
-        fmt = of.get("format", "")
-        if fmt in ("descr", "stats", "chaps", "psc", "cut-list", "waveform", "image"):
-            continue
 
-        print(f"  Downloading {filename}...", file=sys.stderr)
-        resp = requests.get(
-            url,
-            headers={"Authorization": f"bearer {api_key}"},
-            timeout=120,
-            stream=True,
-        )
+def _download_one(session: requests.Session, of: dict, output_path: Path,
+                  cancelled: threading.Event) -> dict | None:
+    """Download a single output file, returning its summary entry on success."""
+    url = of["download_url"]
+    filename = of["filename"]
+
+    print(f"  Downloading {filename}...", file=sys.stderr)
+    dest = output_path / filename
+
+    # Closing the response frees its pool slot even when the body is never read.
+    with session.get(url, timeout=120, stream=True) as resp:
         if resp.status_code != 200:
             print(f"  Warning: Failed to download {filename} (HTTP {resp.status_code})", file=sys.stderr)
-            continue
+            return None
 
-        dest = output_path / filename
+        # Read straight from the urllib3 stream in large blocks instead of via iter_content.
+        resp.raw.decode_content = True
         with open(dest, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
+            while chunk := resp.raw.read(DOWNLOAD_CHUNK_SIZE):
+                if cancelled.is_set():
+                    break
                 f.write(chunk)
+            size_bytes = f.tell()
 
-        downloaded.append({
-            "filename": filename,
-            "format": fmt,
-            "size": of.get("size_string", ""),
-            "path": str(dest.relative_to(REPO_ROOT)),
-        })
+    if cancelled.is_set():
+        dest.unlink(missing_ok=True)
+        return None
+
+    return {
+        "filename": filename,
+        "format": of.get("format", ""),
+        "size": of.get("size_string", ""),
+        "size_bytes": size_bytes,
+        "path": str(dest.relative_to(REPO_ROOT)),
+    }
 
-    return downloaded
+
+def download_results(session: requests.Session, production_data: dict, output_path: Path) -> list[dict]:
+    """Download all output files from a completed production in parallel."""
+    wanted = []
+    for of in production_data.get("output_files", []):
+        if not of.get("download_url") or not of.get("filename"):
+            continue
+
+        if of.get("format", "") in SKIP_FORMATS:
+            continue
+
+        wanted.append(of)
+
+    if not wanted:
+        return []
+
+    cancelled = threading.Event()
+    with ThreadPoolExecutor(max_workers=min(len(wanted), MAX_DOWNLOAD_WORKERS)) as pool:
+        futures = [pool.submit(_download_one, session, of, output_path, cancelled) for of in wanted]
+        try:
+            results = [f.result() for f in futures]
+        except KeyboardInterrupt:
+            # Drop queued downloads and let running ones stop at their next chunk.
+            print("  Cancelling downloads...", file=sys.stderr)
+            cancelled.set()
+            pool.shutdown(cancel_futures=True)
+            raise
+
+    return [r for r in results if r]
 
 
 def update_index(project_path: Path, output_dir: str, downloaded: list[dict], production_uuid: str):
     """Update file_index.json with entries for each downloaded file."""
     index_path = project_path / "file_index.json"
     if index_path.exists():
-        with open(index_path) as f:
-            index = json.load(f)
+        index = read_json(index_path)
     else:
         index = {}
 
@@ -236,11 +373,10 @@ def update_index(project_path: Path, output_dir: str, downloaded: list[dict], pr
             "auphonic_production": production_uuid,
             "format": dl["format"],
         }
+        entry["size_bytes"] = dl["size_bytes"]
         index[key] = entry
 
-    with open(index_path, "w") as f:
-        json.dump(index, f, indent=2)
-        f.write("\n")
+    write_json(index_path, index)
 
 
 def extract_stats(production_data: dict) -> dict | None:
@@ -273,32 +409,55 @@ def extract_stats(production_data: dict) -> dict | None:
 
 def main():
     args = parse_args()
-    load_dotenv()
+    load_dotenv(REPO_ROOT)
 
-    api_key = get_api_key()
+    session = create_session(get_api_key())
     preset_uuid = resolve_preset(args.preset)
 
     project_path = REPO_ROOT / args.project_dir
     file_path = project_path / args.file
 
-    if not file_path.exists():
+    try:
+        file_stat = os.stat(file_path)
+    except FileNotFoundError:
         print(f"Error: File not found: {file_path}", file=sys.stderr)
         sys.exit(1)
+    if not stat.S_ISREG(file_stat.st_mode):
+        print(f"Error: Not a regular file: {file_path}", file=sys.stderr)
+        sys.exit(1)
 
-    ext = file_path.suffix.lower()
+    # An empty stem means no dot at all or a bare dotfile like ".mp3"; neither has an extension.
+    stem, _, ext = file_path.name.rpartition(".")
+    ext = ext.lower() if stem else ""
     if ext not in AUDIO_EXTENSIONS:
-        print(f"Error: Not a supported audio file ({ext}). Supported: {', '.join(sorted(AUDIO_EXTENSIONS))}", file=sys.stderr)
+        shown = f".{ext}" if ext else "no extension"
+        supported = ", ".join(f".{e}" for e in sorted(AUDIO_EXTENSIONS))
+        print(f"Error: Not a supported audio file ({shown}). Supported: {supported}", file=sys.stderr)
         sys.exit(1)
 
     title = args.title or file_path.stem
 
-    production_data = upload_and_start(api_key, file_path, preset_uuid, title)
-    production_uuid = production_data["uuid"]
+    # Create the output directory up front so an unwritable path fails before the upload.
+    output_path = project_path / args.output_dir
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    webhook_url = None if args.no_webhook else (args.webhook_url or os.environ.get("AUPHONIC_WEBHOOK_URL"))
+    webhook_server = start_webhook_listener(args.webhook_port) if webhook_url else None
 
-    production_data = poll_status(api_key, production_uuid)
+    try:
+        production_data = upload_and_start(session, file_path, file_stat.st_size, preset_uuid, title, webhook_url)
+        production_uuid = production_data["uuid"]
 
-    output_path = project_path / args.output_dir
-    downloaded = download_results(api_key, production_data, output_path)
+        if webhook_server:
+            production_data = wait_for_webhook(session, production_uuid, webhook_server)
+        else:
+            production_data = poll_status(session, production_uuid)
+    finally:
+        if webhook_server:
+            webhook_server.shutdown()
+            webhook_server.server_close()
+
+    downloaded = download_results(session, production_data, output_path)
 
     if not downloaded:
         print("Warning: No audio output files were downloaded.", file=sys.stderr)
@@ -319,7 +478,7 @@ def main():
     if audio_stats:
         summary["audio_stats"] = audio_stats
 
-    print(json.dumps(summary, indent=2))
+    emit(summary, indent=True)
 
 
 if __name__ == "__main__":